@@ -1,172 +1,489 @@
-"""
-AWS Lambda Function: DynamoDB User Skill Profile Manager
-Task 1: Store and retrieve LeetCode skill profiles from DynamoDB
-
-This Lambda function provides two core operations:
-1. store_profile: Save user skill profile to DynamoDB
-2. get_profile: Retrieve user skill profile from DynamoDB
-"""
-
-import json
-import boto3
-from datetime import datetime
-from typing import Dict, Any, List
-import os
-
-# Initialize DynamoDB client
-dynamodb = boto3.resource('dynamodb')
-TABLE_NAME = os.environ.get('TABLE_NAME', 'UserSkillProfiles')
-
-
-def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    """
-    Main Lambda handler function
-    
-    Expected event structure:
-    {
-        "operation": "store_profile" | "get_profile",
-        "user_id": "string",
-        "profile_data": {  # Only for store_profile
-            "weak_topics": ["Array", "Dynamic Programming"],
-            "strong_topics": ["Hash Table", "String"],
-            "total_solved": 150
-        }
-    }
-    """
-    try:
-        operation = event.get('operation')
-        
-        if operation == 'store_profile':
-            return store_profile(event)
-        elif operation == 'get_profile':
-            return get_profile(event)
-        else:
-            return error_response(400, f"Invalid operation: {operation}")
-            
-    except Exception as e:
-        print(f"Error in lambda_handler: {str(e)}")
-        return error_response(500, f"Internal server error: {str(e)}")
-
-
-def store_profile(event: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Store user skill profile in DynamoDB
-    
-    Args:
-        event: Contains user_id and profile_data
-        
-    Returns:
-        Success response with stored profile
-    """
-    try:
-        user_id = event.get('user_id')
-        profile_data = event.get('profile_data')
-        
-        # Validation
-        if not user_id:
-            return error_response(400, "user_id is required")
-        
-        if not profile_data:
-            return error_response(400, "profile_data is required")
-        
-        if not isinstance(profile_data.get('weak_topics'), list):
-            return error_response(400, "weak_topics must be a list")
-        
-        if not isinstance(profile_data.get('strong_topics'), list):
-            return error_response(400, "strong_topics must be a list")
-        
-        if not isinstance(profile_data.get('total_solved'), (int, float)):
-            return error_response(400, "total_solved must be a number")
-        
-        # Prepare item for DynamoDB
-        table = dynamodb.Table(TABLE_NAME)
-        timestamp = datetime.utcnow().isoformat()
-        
-        item = {
-            'user_id': user_id,
-            'weak_topics': profile_data['weak_topics'],
-            'strong_topics': profile_data['strong_topics'],
-            'total_solved': int(profile_data['total_solved']),
-            'created_at': timestamp,
-            'updated_at': timestamp
-        }
-        
-        # Store in DynamoDB
-        table.put_item(Item=item)
-        
-        print(f"Successfully stored profile for user: {user_id}")
-        
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'message': 'Profile stored successfully',
-                'user_id': user_id,
-                'profile': item
-            })
-        }
-        
-    except Exception as e:
-        print(f"Error in store_profile: {str(e)}")
-        return error_response(500, f"Failed to store profile: {str(e)}")
-
-
-def get_profile(event: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Retrieve user skill profile from DynamoDB
-    
-    Args:
-        event: Contains user_id
-        
-    Returns:
-        User profile data or error
-    """
-    try:
-        user_id = event.get('user_id')
-        
-        # Validation
-        if not user_id:
-            return error_response(400, "user_id is required")
-        
-        # Query DynamoDB
-        table = dynamodb.Table(TABLE_NAME)
-        response = table.get_item(Key={'user_id': user_id})
-        
-        # Check if item exists
-        if 'Item' not in response:
-            return error_response(404, f"Profile not found for user_id: {user_id}")
-        
-        profile = response['Item']
-        print(f"Successfully retrieved profile for user: {user_id}")
-        
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'message': 'Profile retrieved successfully',
-                'user_id': user_id,
-                'profile': profile
-            })
-        }
-        
-    except Exception as e:
-        print(f"Error in get_profile: {str(e)}")
-        return error_response(500, f"Failed to retrieve profile: {str(e)}")
-
-
-def error_response(status_code: int, message: str) -> Dict[str, Any]:
-    """
-    Generate standardized error response
-    
-    Args:
-        status_code: HTTP status code
-        message: Error message
-        
-    Returns:
-        Formatted error response
-    """
-    return {
-        'statusCode': status_code,
-        'body': json.dumps({
-            'error': message,
-            'timestamp': datetime.utcnow().isoformat()
-        })
-    }
+"""
+AWS Lambda Function: DynamoDB User Skill Profile Manager
+Task 1: Store and retrieve LeetCode skill profiles from DynamoDB
+
+This Lambda function provides two core operations:
+1. store_profile: Save user skill profile to DynamoDB
+2. get_profile: Retrieve user skill profile from DynamoDB
+"""
+
+import time
+import boto3
+import orjson
+from botocore.config import Config
+from collections import OrderedDict
+from pydantic import BaseModel, Field, ValidationError
+from typing import Dict, Any, List
+import os
+
+# Larger keep-alive pool and adaptive retries: warm HTTPS connections
+# survive across invocations and throttles back off smoothly instead of
+# using the small-pool, legacy-retry defaults.
+_CFG = Config(
+    max_pool_connections=50,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    tcp_keepalive=True,
+    connect_timeout=2,
+    read_timeout=30
+)
+
+# Initialize the low-level DynamoDB client once at cold start; warm
+# containers reuse it. The client API takes pre-typed AttributeValue dicts,
+# skipping the per-attribute TypeSerializer traversal the resource API runs
+# on every call.
+ddb = boto3.client('dynamodb', config=_CFG)
+TABLE_NAME = os.environ.get('TABLE_NAME', 'UserSkillProfiles')
+
+# DynamoDB batch API limits
+MAX_BATCH_WRITE_ITEMS = 25
+MAX_BATCH_GET_KEYS = 100
+MAX_BATCH_RETRIES = 5
+
+# In-memory profile cache, shared across warm invocations of this container.
+# Maps user_id -> (monotonic timestamp, profile). Entries expire after
+# CACHE_TTL_SECONDS and the oldest entries are evicted beyond CACHE_MAX_SIZE.
+_PROFILE_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+CACHE_TTL_SECONDS = 60.0
+CACHE_MAX_SIZE = 500
+
+
+# Request models, compiled once at module load. Pydantic v2 validates in
+# its Rust core, replacing the per-call chains of .get/isinstance checks.
+
+class ProfileData(BaseModel):
+    weak_topics: List[str]
+    strong_topics: List[str]
+    total_solved: int
+
+
+class StoreProfileRequest(BaseModel):
+    user_id: str = Field(min_length=1)
+    profile_data: ProfileData
+
+
+class GetProfileRequest(BaseModel):
+    user_id: str = Field(min_length=1)
+
+
+class StoreProfilesRequest(BaseModel):
+    profiles: List[StoreProfileRequest] = Field(min_length=1)
+
+
+class GetProfilesRequest(BaseModel):
+    user_ids: List[str] = Field(min_length=1)
+
+
+def _validation_message(error: ValidationError) -> str:
+    """Flatten a ValidationError into a single readable message."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        if err['loc'] else err['msg']
+        for err in error.errors()
+    )
+
+
+def _iso_now() -> str:
+    """
+    Current UTC time as an ISO-8601 string
+
+    time.strftime over gmtime is cheaper than allocating and formatting
+    a datetime object, which matters on error-heavy traffic where every
+    response carries a timestamp.
+    """
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime())
+
+
+def _cache_get(user_id: str) -> Any:
+    """Return a cached profile if present and fresh, else None."""
+    entry = _PROFILE_CACHE.get(user_id)
+    if entry is None:
+        return None
+    cached_at, profile = entry
+    if time.monotonic() - cached_at >= CACHE_TTL_SECONDS:
+        _PROFILE_CACHE.pop(user_id, None)
+        return None
+    _PROFILE_CACHE.move_to_end(user_id)
+    return profile
+
+
+def _cache_put(user_id: str, profile: Dict[str, Any]) -> None:
+    """Cache a profile, evicting the least recently used entry when full."""
+    _PROFILE_CACHE[user_id] = (time.monotonic(), profile)
+    _PROFILE_CACHE.move_to_end(user_id)
+    while len(_PROFILE_CACHE) > CACHE_MAX_SIZE:
+        _PROFILE_CACHE.popitem(last=False)
+
+
+def _marshal_item(user_id: str, profile_data: Dict[str, Any],
+                  timestamp: str) -> Dict[str, Any]:
+    """
+    Build a pre-typed DynamoDB AttributeValue item for a profile
+    """
+    return {
+        'user_id': {'S': user_id},
+        'weak_topics': {'L': [{'S': t} for t in profile_data['weak_topics']]},
+        'strong_topics': {'L': [{'S': t} for t in profile_data['strong_topics']]},
+        'total_solved': {'N': str(int(profile_data['total_solved']))},
+        'created_at': {'S': timestamp},
+        'updated_at': {'S': timestamp}
+    }
+
+
+def _unmarshal(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a DynamoDB AttributeValue item to plain Python types
+
+    Only the types this table actually stores are handled:
+    S (string), N (number), and L of S (list of strings).
+
+    Numbers become plain int/float rather than decimal.Decimal (which the
+    resource API would return, and which neither stdlib json nor orjson
+    can serialize without a custom encoder).
+    """
+    out: Dict[str, Any] = {}
+    for key, value in item.items():
+        if 'S' in value:
+            out[key] = value['S']
+        elif 'N' in value:
+            number = value['N']
+            try:
+                out[key] = int(number)
+            except ValueError:
+                out[key] = float(number)
+        elif 'L' in value:
+            out[key] = [element['S'] for element in value['L']]
+    return out
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Main Lambda handler function
+    
+    Expected event structure:
+    {
+        "operation": "store_profile" | "get_profile",
+        "user_id": "string",
+        "profile_data": {  # Only for store_profile
+            "weak_topics": ["Array", "Dynamic Programming"],
+            "strong_topics": ["Hash Table", "String"],
+            "total_solved": 150
+        }
+    }
+
+    Bulk variants amortize HTTP and signing overhead across many users:
+    {
+        "operation": "store_profiles",
+        "profiles": [{"user_id": "...", "profile_data": {...}}, ...]
+    }
+    {
+        "operation": "get_profiles",
+        "user_ids": ["user1", "user2", ...]
+    }
+    """
+    try:
+        operation = event.get('operation')
+
+        if operation == 'store_profile':
+            return store_profile(event)
+        elif operation == 'get_profile':
+            return get_profile(event)
+        elif operation == 'store_profiles':
+            return store_profiles(event)
+        elif operation == 'get_profiles':
+            return get_profiles(event)
+        else:
+            return error_response(400, f"Invalid operation: {operation}")
+            
+    except Exception as e:
+        print(f"Error in lambda_handler: {str(e)}")
+        return error_response(500, f"Internal server error: {str(e)}")
+
+
+def store_profile(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Store user skill profile in DynamoDB
+    
+    Args:
+        event: Contains user_id and profile_data
+        
+    Returns:
+        Success response with stored profile
+    """
+    try:
+        # One timestamp per invocation, shared by the item and any error body
+        timestamp = _iso_now()
+
+        # Validation
+        try:
+            request = StoreProfileRequest.model_validate(event)
+        except ValidationError as e:
+            return error_response(400, _validation_message(e), timestamp)
+
+        user_id = request.user_id
+        weak_topics = request.profile_data.weak_topics
+        strong_topics = request.profile_data.strong_topics
+        total_solved = request.profile_data.total_solved
+
+        # Update in place: created_at is only written the first time, so
+        # re-stores no longer clobber the original creation timestamp
+        response = ddb.update_item(
+            TableName=TABLE_NAME,
+            Key={'user_id': {'S': user_id}},
+            UpdateExpression=(
+                'SET weak_topics = :w, strong_topics = :s, '
+                'total_solved = :n, updated_at = :t, '
+                'created_at = if_not_exists(created_at, :t)'
+            ),
+            ExpressionAttributeValues={
+                ':w': {'L': [{'S': t} for t in weak_topics]},
+                ':s': {'L': [{'S': t} for t in strong_topics]},
+                ':n': {'N': str(total_solved)},
+                ':t': {'S': timestamp}
+            },
+            ReturnValues='ALL_NEW'
+        )
+        item = _unmarshal(response['Attributes'])
+
+        # Drop any stale cached copy so the next read sees the new profile
+        _PROFILE_CACHE.pop(user_id, None)
+
+        print(f"Successfully stored profile for user: {user_id}")
+        
+        return {
+            'statusCode': 200,
+            'body': orjson.dumps({
+                'message': 'Profile stored successfully',
+                'user_id': user_id,
+                'profile': item
+            }).decode()
+        }
+        
+    except Exception as e:
+        print(f"Error in store_profile: {str(e)}")
+        return error_response(500, f"Failed to store profile: {str(e)}")
+
+
+def get_profile(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Retrieve user skill profile from DynamoDB
+    
+    Args:
+        event: Contains user_id
+        
+    Returns:
+        User profile data or error
+    """
+    try:
+        # Validation
+        try:
+            user_id = GetProfileRequest.model_validate(event).user_id
+        except ValidationError as e:
+            return error_response(400, _validation_message(e))
+
+        # Serve repeat reads from the warm-container cache
+        profile = _cache_get(user_id)
+        if profile is None:
+            # Query DynamoDB
+            response = ddb.get_item(TableName=TABLE_NAME,
+                                    Key={'user_id': {'S': user_id}})
+
+            # Check if item exists
+            if 'Item' not in response:
+                return error_response(404, f"Profile not found for user_id: {user_id}")
+
+            profile = _unmarshal(response['Item'])
+            _cache_put(user_id, profile)
+
+        print(f"Successfully retrieved profile for user: {user_id}")
+        
+        return {
+            'statusCode': 200,
+            'body': orjson.dumps({
+                'message': 'Profile retrieved successfully',
+                'user_id': user_id,
+                'profile': profile
+            }).decode()
+        }
+        
+    except Exception as e:
+        print(f"Error in get_profile: {str(e)}")
+        return error_response(500, f"Failed to retrieve profile: {str(e)}")
+
+
+def store_profiles(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Store multiple user skill profiles in DynamoDB via BatchWriteItem
+
+    Batching amortizes HTTP and SigV4 signing overhead across up to 25
+    items per request, instead of one round-trip per profile.
+
+    Args:
+        event: Contains profiles, a list of {user_id, profile_data} dicts
+
+    Returns:
+        Success response with the stored user_ids
+    """
+    try:
+        # Validation
+        try:
+            profiles = StoreProfilesRequest.model_validate(event).profiles
+        except ValidationError as e:
+            return error_response(400, _validation_message(e))
+
+        # Last write wins for duplicate user_ids: DynamoDB rejects a
+        # BatchWriteItem request containing duplicate keys with a
+        # ValidationException
+        profiles = list({p.user_id: p for p in profiles}.values())
+
+        timestamp = _iso_now()
+
+        # Write in chunks of 25, retrying unprocessed items with backoff.
+        # Each chunk's cache entries are invalidated as soon as that chunk
+        # lands, so a failure in a later chunk cannot leave warm-container
+        # reads serving stale data for profiles already written.
+        for start in range(0, len(profiles), MAX_BATCH_WRITE_ITEMS):
+            chunk = profiles[start:start + MAX_BATCH_WRITE_ITEMS]
+            pending = [
+                {'PutRequest': {'Item': _marshal_item(p.user_id,
+                                                      p.profile_data.model_dump(),
+                                                      timestamp)}}
+                for p in chunk
+            ]
+            for attempt in range(MAX_BATCH_RETRIES):
+                response = ddb.batch_write_item(
+                    RequestItems={TABLE_NAME: pending})
+                pending = response.get('UnprocessedItems', {}).get(TABLE_NAME)
+                if not pending:
+                    break
+                time.sleep(2 ** attempt * 0.05)
+            else:
+                # Part of this chunk may still have been written, so drop
+                # its cache entries too before reporting the failure
+                for p in chunk:
+                    _PROFILE_CACHE.pop(p.user_id, None)
+                return error_response(500, "Failed to store all profiles: "
+                                           "unprocessed items remain after retries")
+
+            for p in chunk:
+                _PROFILE_CACHE.pop(p.user_id, None)
+
+        user_ids = [p.user_id for p in profiles]
+
+        print(f"Successfully stored {len(user_ids)} profiles")
+
+        return {
+            'statusCode': 200,
+            'body': orjson.dumps({
+                'message': 'Profiles stored successfully',
+                'user_ids': user_ids
+            }).decode()
+        }
+
+    except Exception as e:
+        print(f"Error in store_profiles: {str(e)}")
+        return error_response(500, f"Failed to store profiles: {str(e)}")
+
+
+def get_profiles(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Retrieve multiple user skill profiles from DynamoDB via BatchGetItem
+
+    Args:
+        event: Contains user_ids, a list of user ID strings
+
+    Returns:
+        Profiles found, plus the user_ids that had no profile
+    """
+    try:
+        # Validation
+        try:
+            user_ids = GetProfilesRequest.model_validate(event).user_ids
+        except ValidationError as e:
+            return error_response(400, _validation_message(e))
+
+        # Dedupe while preserving order: DynamoDB rejects a BatchGetItem
+        # request containing duplicate keys with a ValidationException
+        user_ids = list(dict.fromkeys(user_ids))
+
+        profiles = []
+
+        # Fetch in chunks of 100, retrying unprocessed keys with backoff
+        for start in range(0, len(user_ids), MAX_BATCH_GET_KEYS):
+            chunk = user_ids[start:start + MAX_BATCH_GET_KEYS]
+            keys = [{'user_id': {'S': u}} for u in chunk]
+            for attempt in range(MAX_BATCH_RETRIES):
+                response = ddb.batch_get_item(
+                    RequestItems={TABLE_NAME: {'Keys': keys}})
+                profiles.extend(_unmarshal(item)
+                                for item in response['Responses'][TABLE_NAME])
+                keys = response.get('UnprocessedKeys', {}) \
+                               .get(TABLE_NAME, {}).get('Keys')
+                if not keys:
+                    break
+                time.sleep(2 ** attempt * 0.05)
+            else:
+                return error_response(500, "Failed to retrieve all profiles: "
+                                           "unprocessed keys remain after retries")
+
+        found = {p['user_id'] for p in profiles}
+        missing = [u for u in user_ids if u not in found]
+
+        print(f"Successfully retrieved {len(profiles)} of {len(user_ids)} profiles")
+
+        return {
+            'statusCode': 200,
+            'body': orjson.dumps({
+                'message': 'Profiles retrieved successfully',
+                'profiles': profiles,
+                'missing_user_ids': missing
+            }).decode()
+        }
+
+    except Exception as e:
+        print(f"Error in get_profiles: {str(e)}")
+        return error_response(500, f"Failed to retrieve profiles: {str(e)}")
+
+
+def error_response(status_code: int, message: str,
+                   timestamp: str = None) -> Dict[str, Any]:
+    """
+    Generate standardized error response
+
+    Args:
+        status_code: HTTP status code
+        message: Error message
+        timestamp: Pre-computed ISO timestamp, to avoid recomputing when
+            the caller already has one for this invocation
+
+    Returns:
+        Formatted error response
+    """
+    return {
+        'statusCode': status_code,
+        'body': orjson.dumps({
+            'error': message,
+            'timestamp': timestamp or _iso_now()
+        }).decode()
+    }
+
+
+def _warm() -> None:
+    """
+    Front-load lazy initialization into the Lambda init phase
+
+    Exercising the serializer, validator, and timestamp formatter at
+    import forces their lazy imports and one-time setup while the init
+    phase runs at full vCPU (and is snapshotted under SnapStart), so the
+    first real invocation skips those penalties. Recommended function
+    memory: 1024MB, since Lambda CPU scales with memory and these paths
+    are CPU-bound.
+    """
+    try:
+        orjson.dumps({"x": 1})
+        GetProfileRequest.model_validate({'user_id': 'warmup'})
+        _iso_now()
+    except Exception as e:
+        print(f"Warm-up skipped: {str(e)}")
+
+
+_warm()
@@ -6,25 +6,253 @@ This Lambda function invokes Anthropic Claude 3 Sonnet via Amazon Bedrock
 to generate structured learning recommendations based on user skill profile.
 """
 
+import asyncio
+import hashlib
 import json
+import re
+import sys
+import time
 import boto3
+import httpx
+import orjson
+from bisect import bisect_right
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.config import Config
 from datetime import datetime
+from functools import lru_cache
+from pydantic import BaseModel, Field, ValidationError
 from typing import Dict, Any, List
 import os
 
-# Initialize Bedrock Runtime client
-bedrock_runtime = boto3.client('bedrock-runtime', region_name='us-east-1')
+# Larger keep-alive pool and adaptive retries for the boto3 clients (the
+# DynamoDB roadmap cache): warm HTTPS connections survive across
+# invocations instead of using the small-pool, legacy-retry defaults.
+# The signed httpx Bedrock path carries its own backoff in
+# invoke_for_topic, since botocore's retry machinery does not apply there.
+_CFG = Config(
+    max_pool_connections=50,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    tcp_keepalive=True,
+    connect_timeout=2,
+    read_timeout=30
+)
 
 # Model configuration
 MODEL_ID = "anthropic.claude-3-sonnet-20240229-v1:0"
+BEDROCK_REGION = "us-east-1"
+BEDROCK_INVOKE_URL = (
+    f"https://bedrock-runtime.{BEDROCK_REGION}.amazonaws.com"
+    f"/model/{MODEL_ID}/invoke"
+)
 TEMPERATURE = 0.3
-MAX_TOKENS = 4096
+MAX_TOKENS = 4096  # upper bound; per-call budgets are sized to the day count
+
+# Token budget per sub-call: fixed overhead plus an allowance per roadmap
+# day. Output tokens dominate both latency and cost, so a one-day prompt
+# should not get the full 4096-token ceiling.
+TOKENS_BASE = 400
+TOKENS_PER_DAY = 250
+
+# Request model, compiled once at module load. Pydantic v2 validates in
+# its Rust core, replacing the per-call chain of isinstance checks.
+
+class RoadmapRequest(BaseModel):
+    weak_topics: List[str] = Field(min_length=1)
+    total_solved: int = 0
+
+
+def _validation_message(error: ValidationError) -> str:
+    """Flatten a ValidationError into a single readable message."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        if err['loc'] else err['msg']
+        for err in error.errors()
+    )
+
+
+# SigV4 signer, built lazily on the first Bedrock call. Validation-only
+# paths (bad input) never pay the credential-resolution cost, and warm
+# containers reuse the signer across invocations. Signing requests directly
+# and POSTing them with httpx skips boto3's per-call endpoint resolution,
+# operation-model dispatch, and parameter validation.
+_SIGNER = None
+
+
+def _signer() -> SigV4Auth:
+    global _SIGNER
+    if _SIGNER is None:
+        _SIGNER = SigV4Auth(boto3.Session().get_credentials(),
+                            'bedrock', BEDROCK_REGION)
+    return _SIGNER
+
+
+def _sign_invoke_request(body: bytes) -> Dict[str, str]:
+    """Build SigV4 headers for a Bedrock invoke POST with the given body."""
+    request = AWSRequest(method='POST', url=BEDROCK_INVOKE_URL, data=body,
+                         headers={'Content-Type': 'application/json'})
+    _signer().add_auth(request)
+    return dict(request.headers)
+
+
+# One event loop for the container's lifetime. asyncio.run would build and
+# tear down a loop per invocation, which also tears down anything bound to
+# it - in particular the HTTP client's connections. Driving every handler
+# through this loop lets the client below keep its warm HTTP/2 connections
+# to Bedrock across invocations.
+_LOOP = asyncio.new_event_loop()
+
+_HTTP = None
+
+
+def _http() -> httpx.AsyncClient:
+    """HTTP/2 client shared across invocations, built on first Bedrock call."""
+    global _HTTP
+    if _HTTP is None:
+        _HTTP = httpx.AsyncClient(http2=True, timeout=30.0)
+    return _HTTP
+
+
+# Roadmap memoization: identical (weak_topics, user_level) inputs map to the
+# same SHA-256 key in a TTL'd DynamoDB table, trading a ~5ms GetItem for a
+# multi-second Bedrock fan-out on repeat requests.
+CACHE_TABLE_NAME = os.environ.get('ROADMAP_CACHE_TABLE', 'RoadmapCache')
+CACHE_TTL_SECONDS = 7 * 86400
+
+_DDB = None
+
+
+def _ddb() -> Any:
+    global _DDB
+    if _DDB is None:
+        _DDB = boto3.client('dynamodb', config=_CFG)
+    return _DDB
+
+
+# LeetCode's topic vocabulary is small and stable (~30 canonical names), so
+# interned topic strings make the repeated equality/hash work on sorting,
+# joining, and cache keys pointer comparisons instead of character scans.
+
+@lru_cache(maxsize=1024)
+def _join_topics(topics: tuple) -> str:
+    """Comma-join a topic tuple, cached across repeated combinations."""
+    return ", ".join(topics)
+
+
+def _intern_topics(topics: List[str]) -> List[str]:
+    """Intern each topic string so downstream comparisons are cheap."""
+    return [sys.intern(t) for t in topics]
+
+
+def _cache_key(weak_topics: List[str], user_level: str) -> str:
+    """SHA-256 of the canonicalized inputs; topic order does not matter."""
+    canonical = orjson.dumps({"t": sorted(weak_topics), "l": user_level})
+    return hashlib.sha256(canonical).hexdigest()
+
+
+def _cache_lookup(key: str) -> Any:
+    """Return a cached roadmap, or None on miss or cache failure."""
+    try:
+        response = _ddb().get_item(TableName=CACHE_TABLE_NAME,
+                                   Key={'prompt_hash': {'S': key}})
+        item = response.get('Item')
+        if item is None:
+            return None
+        return orjson.loads(item['roadmap']['S'])
+    except Exception as e:
+        # A broken cache must never fail the request
+        print(f"Roadmap cache lookup failed: {str(e)}")
+        return None
+
+
+def _cache_store(key: str, roadmap: Dict[str, Any]) -> None:
+    """Store a generated roadmap with a 7-day TTL; failures are ignored."""
+    try:
+        _ddb().put_item(TableName=CACHE_TABLE_NAME, Item={
+            'prompt_hash': {'S': key},
+            'roadmap': {'S': orjson.dumps(roadmap).decode()},
+            'ttl': {'N': str(int(time.time()) + CACHE_TTL_SECONDS)}
+        })
+    except Exception as e:
+        print(f"Roadmap cache store failed: {str(e)}")
+
+# Extracts a JSON object from a markdown code fence, or bare, in one pass
+_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*\})\s*```|(\{.*\})", re.S)
+
+# Roadmap configuration
+TOTAL_DAYS = 7
+MAX_TOPICS = 7  # one topic per day at most
+MAX_CONCURRENT_INVOCATIONS = 5  # stay under Bedrock throttling limits
+
+# Retry policy for the signed Bedrock path: throttles and transient
+# server errors back off and retry rather than failing the whole request
+MAX_INVOKE_ATTEMPTS = 5
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503})
+
+# Static prompt skeleton, built once at module load. %-substitution avoids
+# both re-parsing the large literal per call and the {{ }} escaping that
+# .format would need around the JSON schema braces.
+# Placeholders: user_level, topic, assigned days, first day number.
+_PROMPT_TEMPLATE = """You are an expert competitive programming mentor specializing in LeetCode preparation.
+
+User Profile:
+- Skill Level: %s
+- Weak Topic: %s
+
+Task: Generate the plan for day(s) %s of a 7-day learning roadmap, focused entirely on this weak topic.
+
+Requirements:
+1. Focus only on the topic provided
+2. Provide 2-3 specific problem recommendations per day
+3. Include topic-wise recommendations (which concepts to study)
+4. Provide learning resources (no full solutions, only conceptual guidance)
+5. Ensure progressive difficulty across the assigned days (start easier, build up)
+6. Include daily goals and milestones
+7. Use exactly the day numbers listed above, one roadmap entry per day
+
+Return your response in the following JSON format:
+{
+  "roadmap": [
+    {
+      "day": %d,
+      "focus_topic": "Topic name",
+      "daily_goal": "What to achieve today",
+      "problems": [
+        {
+          "title": "Problem name",
+          "difficulty": "Easy/Medium/Hard",
+          "key_concept": "Main concept to learn",
+          "approach_hint": "High-level approach (no code)"
+        }
+      ],
+      "study_resources": [
+        "Resource 1: Brief description",
+        "Resource 2: Brief description"
+      ]
+    }
+  ]
+}
+
+Important: Return ONLY valid JSON, no additional text or markdown formatting."""
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Synchronous Lambda entrypoint
+
+    Runs the async handler to completion on the module-level event loop.
+    Using an async handler lets the Bedrock call be awaited instead of
+    blocking the worker, so multiple requests sharing a warm container can
+    overlap their I/O waits; reusing one loop keeps the shared HTTP
+    client's connections alive between invocations.
+    """
+    return _LOOP.run_until_complete(_async_handler(event, context))
+
+
+async def _async_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Main Lambda handler function
-    
+
     Expected event structure:
     {
         "weak_topics": ["Dynamic Programming", "Graph Algorithms"],
@@ -32,38 +260,33 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     }
     """
     try:
-        # Extract input parameters
-        weak_topics = event.get('weak_topics', [])
-        total_solved = event.get('total_solved', 0)
-        
         # Validation
-        if not weak_topics:
-            return error_response(400, "weak_topics is required and cannot be empty")
-        
-        if not isinstance(weak_topics, list):
-            return error_response(400, "weak_topics must be a list")
-        
-        if not isinstance(total_solved, (int, float)):
-            return error_response(400, "total_solved must be a number")
-        
+        try:
+            request = RoadmapRequest.model_validate(event)
+        except ValidationError as e:
+            return error_response(400, _validation_message(e))
+
+        weak_topics = _intern_topics(request.weak_topics)
+        total_solved = request.total_solved
+
         # Determine user level based on problems solved
         user_level = determine_user_level(total_solved)
         
         # Generate learning roadmap using Bedrock
-        roadmap = generate_learning_roadmap(weak_topics, user_level)
+        roadmap = await generate_learning_roadmap(weak_topics, user_level)
         
         print(f"Successfully generated roadmap for user with {total_solved} problems solved")
         
         return {
             'statusCode': 200,
-            'body': json.dumps({
+            'body': orjson.dumps({
                 'message': 'Learning roadmap generated successfully',
                 'user_level': user_level,
                 'total_solved': total_solved,
                 'weak_topics': weak_topics,
                 'roadmap': roadmap,
                 'generated_at': datetime.utcnow().isoformat()
-            })
+            }).decode()
         }
         
     except Exception as e:
@@ -71,131 +294,180 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         return error_response(500, f"Internal server error: {str(e)}")
 
 
+# Skill-level buckets: < 50 solved is Beginner, < 200 Intermediate,
+# everything above Advanced
+_LEVELS = ("Beginner", "Intermediate", "Advanced")
+_LEVEL_CUTOFFS = (50, 200)
+
+
 def determine_user_level(total_solved: int) -> str:
     """
     Determine user skill level based on problems solved
-    
+
     Args:
         total_solved: Total number of problems solved
-        
+
     Returns:
         User level: Beginner, Intermediate, or Advanced
     """
-    if total_solved < 50:
-        return "Beginner"
-    elif total_solved < 200:
-        return "Intermediate"
-    else:
-        return "Advanced"
+    return _LEVELS[bisect_right(_LEVEL_CUTOFFS, total_solved)]
 
 
-def generate_learning_roadmap(weak_topics: List[str], user_level: str) -> Dict[str, Any]:
+async def generate_learning_roadmap(weak_topics: List[str], user_level: str) -> Dict[str, Any]:
     """
     Generate personalized learning roadmap using Claude 3 Sonnet
-    
+
     Args:
         weak_topics: List of topics user struggles with
         user_level: User's skill level (Beginner/Intermediate/Advanced)
-        
+
     Returns:
         Structured learning roadmap
     """
     try:
-        # Construct the prompt
-        prompt = build_prompt(weak_topics, user_level)
-        
-        # Prepare request body for Bedrock
-        request_body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": MAX_TOKENS,
-            "temperature": TEMPERATURE,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        }
-        
-        print(f"Invoking Bedrock model: {MODEL_ID}")
-        
-        # Invoke Bedrock model
-        response = bedrock_runtime.invoke_model(
-            modelId=MODEL_ID,
-            body=json.dumps(request_body)
-        )
-        
-        # Parse response
-        response_body = json.loads(response['body'].read())
-        ai_response = response_body['content'][0]['text']
-        
-        # Parse JSON from AI response
-        roadmap = parse_ai_response(ai_response)
-        
+        # Serve repeated (weak_topics, user_level) combos from the
+        # memoization table instead of re-invoking Bedrock
+        cache_key = _cache_key(weak_topics[:MAX_TOPICS], user_level)
+        cached = _cache_lookup(cache_key)
+        if cached is not None:
+            print("Roadmap cache hit")
+            return cached
+
+        # Split the plan into one small prompt per topic so the independent
+        # Bedrock calls can run concurrently; wall-clock time becomes the max
+        # of the per-call latencies instead of their sum.
+        assignments = assign_days(weak_topics[:MAX_TOPICS])
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_INVOCATIONS)
+
+        print(f"Invoking Bedrock model: {MODEL_ID} ({len(assignments)} concurrent prompts)")
+
+        # The shared client multiplexes the fan-out over its warm HTTP/2
+        # connections; the persistent loop keeps them valid across calls
+        fragments = await asyncio.gather(*[
+            invoke_for_topic(semaphore, topic, days, user_level)
+            for topic, days in assignments
+        ])
+
+        roadmap = merge_roadmap_fragments(fragments,
+                                          [topic for topic, _ in assignments])
+        _cache_store(cache_key, roadmap)
         return roadmap
-        
+
     except Exception as e:
         print(f"Error in generate_learning_roadmap: {str(e)}")
         raise
 
 
-def build_prompt(weak_topics: List[str], user_level: str) -> str:
+def assign_days(topics: List[str]) -> List[tuple]:
     """
-    Build structured prompt for Claude 3 Sonnet
-    
+    Distribute the 7 roadmap days across topics round-robin
+
     Args:
-        weak_topics: List of weak topics
+        topics: Weak topics, already capped at MAX_TOPICS
+
+    Returns:
+        List of (topic, [day numbers]) pairs
+    """
+    days_per_topic: List[List[int]] = [[] for _ in topics]
+    for day in range(1, TOTAL_DAYS + 1):
+        days_per_topic[(day - 1) % len(topics)].append(day)
+    return list(zip(topics, days_per_topic))
+
+
+async def invoke_for_topic(semaphore: asyncio.Semaphore,
+                           topic: str, days: List[int], user_level: str) -> Dict[str, Any]:
+    """
+    Invoke Claude for a single topic's share of the roadmap
+
+    The request is SigV4-signed directly and POSTed through the shared
+    httpx client, bypassing boto3's per-call dispatch layers on the hot
+    path.
+
+    Args:
+        semaphore: Concurrency limiter shared across the fan-out
+        topic: Weak topic this call covers
+        days: Day numbers assigned to this topic
         user_level: User's skill level
-        
+
     Returns:
-        Formatted prompt string
+        Parsed roadmap fragment for this topic
     """
-    topics_str = ", ".join(weak_topics)
-    
-    prompt = f"""You are an expert competitive programming mentor specializing in LeetCode preparation.
+    body = orjson.dumps({
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": min(MAX_TOKENS, TOKENS_BASE + TOKENS_PER_DAY * len(days)),
+        "temperature": TEMPERATURE,
+        "messages": [
+            {
+                "role": "user",
+                "content": build_prompt(topic, days, user_level)
+            }
+        ]
+    })
 
-User Profile:
-- Skill Level: {user_level}
-- Weak Topics: {topics_str}
+    # Retry throttles and transient server errors with exponential backoff,
+    # re-signing each attempt since SigV4 headers are timestamped. Dropped
+    # connections retry the same way as retryable statuses.
+    async with semaphore:
+        for attempt in range(MAX_INVOKE_ATTEMPTS):
+            try:
+                response = await _http().post(BEDROCK_INVOKE_URL,
+                                              headers=_sign_invoke_request(body),
+                                              content=body)
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    break
+            except httpx.TransportError as e:
+                if attempt == MAX_INVOKE_ATTEMPTS - 1:
+                    raise
+                print(f"Bedrock request failed ({str(e)}), retrying")
+            await asyncio.sleep(2 ** attempt * 0.1)
+        response.raise_for_status()
 
-Task: Generate a structured 7-day learning roadmap to help this user improve their weak topics.
+    response_body = orjson.loads(response.content)
+    return parse_ai_response(response_body['content'][0]['text'])
 
-Requirements:
-1. Focus on the weak topics provided
-2. Provide 2-3 specific problem recommendations per day
-3. Include topic-wise recommendations (which concepts to study)
-4. Provide learning resources (no full solutions, only conceptual guidance)
-5. Ensure progressive difficulty (start easier, build up)
-6. Include daily goals and milestones
 
-Return your response in the following JSON format:
-{{
-  "roadmap": [
-    {{
-      "day": 1,
-      "focus_topic": "Topic name",
-      "daily_goal": "What to achieve today",
-      "problems": [
-        {{
-          "title": "Problem name",
-          "difficulty": "Easy/Medium/Hard",
-          "key_concept": "Main concept to learn",
-          "approach_hint": "High-level approach (no code)"
-        }}
-      ],
-      "study_resources": [
-        "Resource 1: Brief description",
-        "Resource 2: Brief description"
-      ]
-    }}
-  ],
-  "overall_strategy": "Brief overview of the 7-day plan",
-  "success_metrics": "How to measure progress"
-}}
+def merge_roadmap_fragments(fragments: List[Dict[str, Any]],
+                            topics: List[str]) -> Dict[str, Any]:
+    """
+    Merge per-topic roadmap fragments into the final roadmap structure
 
-Important: Return ONLY valid JSON, no additional text or markdown formatting."""
-    
-    return prompt
+    Args:
+        fragments: Parsed per-topic responses, each with a 'roadmap' list
+        topics: Topics covered, in fan-out order
+
+    Returns:
+        Combined roadmap with days sorted and overall fields filled in
+    """
+    days = [entry for fragment in fragments for entry in fragment['roadmap']]
+    days.sort(key=lambda entry: entry.get('day', 0))
+
+    return {
+        'roadmap': days,
+        'overall_strategy': (
+            f"7-day plan rotating through your weak topics ({_join_topics(tuple(topics))}), "
+            "with progressive difficulty within each topic."
+        ),
+        'success_metrics': (
+            "Complete the recommended problems each day and re-attempt any "
+            "you could not solve without hints by the end of the week."
+        )
+    }
+
+
+def build_prompt(topic: str, days: List[int], user_level: str) -> str:
+    """
+    Build structured prompt for one topic's share of the roadmap
+
+    Args:
+        topic: Weak topic this prompt covers
+        days: Day numbers assigned to this topic
+        user_level: User's skill level
+
+    Returns:
+        Formatted prompt string
+    """
+    days_str = ", ".join(str(day) for day in days)
+    return _PROMPT_TEMPLATE % (user_level, topic, days_str, days[0])
 
 
 def parse_ai_response(ai_response: str) -> Dict[str, Any]:
@@ -209,27 +481,22 @@ def parse_ai_response(ai_response: str) -> Dict[str, Any]:
         Parsed roadmap dictionary
     """
     try:
-        # Try to extract JSON from response
-        # Sometimes Claude wraps JSON in markdown code blocks
-        if "```json" in ai_response:
-            start = ai_response.find("```json") + 7
-            end = ai_response.find("```", start)
-            json_str = ai_response[start:end].strip()
-        elif "```" in ai_response:
-            start = ai_response.find("```") + 3
-            end = ai_response.find("```", start)
-            json_str = ai_response[start:end].strip()
-        else:
-            json_str = ai_response.strip()
-        
-        roadmap = json.loads(json_str)
-        
+        # The prompt asks for bare JSON, so try a direct parse first and
+        # only fall back to stripping markdown code fences if that fails
+        try:
+            roadmap = json.loads(ai_response.strip())
+        except json.JSONDecodeError:
+            match = _FENCE_RE.search(ai_response)
+            if match is None:
+                raise ValueError("No JSON object found in AI response")
+            roadmap = json.loads(match.group(1) or match.group(2))
+
         # Validate structure
         if 'roadmap' not in roadmap:
             raise ValueError("Response missing 'roadmap' field")
-        
+
         return roadmap
-        
+
     except json.JSONDecodeError as e:
         print(f"Failed to parse AI response as JSON: {str(e)}")
         print(f"Raw response: {ai_response}")
@@ -249,8 +516,33 @@ def error_response(status_code: int, message: str) -> Dict[str, Any]:
     """
     return {
         'statusCode': status_code,
-        'body': json.dumps({
+        'body': orjson.dumps({
             'error': message,
             'timestamp': datetime.utcnow().isoformat()
-        })
+        }).decode()
     }
+
+
+def _warm() -> None:
+    """
+    Front-load lazy initialization into the Lambda init phase
+
+    Signing a dummy request at import resolves credentials and pulls in
+    botocore's auth machinery, and exercising the serializer and
+    validator forces their one-time setup, all while the init phase runs
+    at full vCPU (and is snapshotted under SnapStart). The first real
+    invocation then skips those penalties. Recommended function memory:
+    1024MB, since Lambda CPU scales with memory and the JSON/SigV4 work
+    here is CPU-bound.
+    """
+    try:
+        orjson.dumps({"x": 1})
+        RoadmapRequest.model_validate({'weak_topics': ['Array']})
+        _ddb()
+        _sign_invoke_request(b'{}')
+    except Exception as e:
+        # Outside Lambda (or without credentials) warming is best-effort
+        print(f"Warm-up skipped: {str(e)}")
+
+
+_warm()